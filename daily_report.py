@@ -1,13 +1,28 @@
 import os
-import glob
 import yaml
 from datetime import datetime, timedelta, timezone
+import numpy as np
 import pandas as pd
 import re
+import json
+import math
+import asyncio
+import atexit
+import hashlib
+import sqlite3
+from contextlib import closing
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
-from typing import Optional
-from concurrent.futures import ThreadPoolExecutor
+from openai import AsyncOpenAI
+from typing import Iterable, List, Optional
+
+try:
+    # pyarrow 是可选依赖：有它就用多线程 CSV 解析 / Parquet，没有就退回 pandas 默认实现
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
 
 # 加载 .env 里的 DEEPSEEK_API_KEY
 load_dotenv()
@@ -15,7 +30,15 @@ load_dotenv()
 RAW_DIR = "data/raw"
 SETTINGS_PATH = "config/settings.yaml"
 REPORT_DIR = "data/reports"
-SEEN_PATH = "data/seen_items.csv"   # ⭐ 已推送过的链接集合
+SEEN_DB_PATH = "data/seen_items.sqlite"   # ⭐ 已推送过的链接集合
+SEEN_PATH = "data/seen_items.csv"   # 旧版的已推送链接文件（迁移 / 导出用）
+CACHE_PATH = "data/cache/llm_cache.sqlite"   # 翻译 / 打分结果的本地缓存
+NEWS_EXTS = (".parquet", ".csv")   # 每日抓取结果的文件格式，同一天两种都有时优先 parquet
+
+# 进程内共用一个异步 DeepSeek 客户端：所有打分 / 翻译请求跑在同一个事件循环里，
+# 共用一个 HTTP/2 连接池（避免每次调用都重新握手）
+_ASYNC_CLIENT: Optional[AsyncOpenAI] = None
+_ASYNC_RUNNER: Optional[asyncio.Runner] = None
 
 
 # ======================
@@ -27,114 +50,254 @@ def load_settings():
         return yaml.safe_load(f)
 
 
-def translate_to_zh(text: str) -> str:
+def _read_csv(path: str) -> pd.DataFrame:
+    """
+    读 CSV：装了 pyarrow 就用它的多线程解析器，否则退回 pandas 默认引擎。
+    """
+    if pa_csv is not None:
+        try:
+            # 摘要里可能有换行（带引号的字段），需要打开 newlines_in_values
+            table = pa_csv.read_csv(
+                path,
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            )
+            return table.to_pandas()
+        except pa.ArrowInvalid as e:
+            print(f"[警告] pyarrow 解析 {path} 失败（{e}），改用 pandas 默认引擎。")
+    return pd.read_csv(path)
+
+
+def _parse_times(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    把 published / fetched_at 解析成 UTC 时间（只在读入时做一次），
+    并预先算好排序 / 过滤用的 _ts（published 缺失时用 fetched_at）。
+    """
+    for col in ["published", "fetched_at"]:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
+    df["_ts"] = df["published"].where(df["published"].notna(), df["fetched_at"])
+    return df
+
+
+def _read_news_file(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = _read_csv(path)
+    return _parse_times(df)
+
+
+# ======================
+#   LLM 结果缓存（sqlite）
+# ======================
+
+def _open_cache() -> sqlite3.Connection:
+    """
+    打开（必要时创建）LLM 结果缓存库，表结构为 kv(key, val)。
+    autocommit + WAL，方便并发协程随时写入。
+    """
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS kv(key TEXT PRIMARY KEY, val TEXT)")
+    return conn
+
+
+_CACHE_CONN = _open_cache()
+
+
+def _cache_key(func_name: str, text: str, profile: str = "") -> str:
+    return hashlib.sha1((func_name + "|" + text + "|" + profile).encode("utf-8")).hexdigest()
+
+
+def cache_get(key: str) -> Optional[str]:
+    row = _CACHE_CONN.execute("SELECT val FROM kv WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def cache_set(key: str, val: str):
+    _CACHE_CONN.execute("INSERT OR REPLACE INTO kv(key, val) VALUES (?, ?)", (key, val))
+
+
+def _translation_messages(text: str) -> list:
+    return [
+        {"role": "system", "content": "你是一个精准翻译助手，只输出翻译结果。"},
+        {"role": "user", "content": f"请把下面英文翻成自然简洁的中文：\n{text}"},
+    ]
+
+
+async def _translate_async(client: AsyncOpenAI, text: str) -> str:
     """
-    使用 DeepSeek 进行英文标题 → 中文翻译。
+    使用 DeepSeek 进行英文标题 → 中文翻译，结果写入 LLM 缓存。
+    出错时返回原文，且不写缓存（下次重试）。
     """
     text = text or ""
     if not text.strip():
         return ""
 
-    api_key = os.environ.get("DEEPSEEK_API_KEY")
-    if not api_key:
-        # 没 key 就直接返回原文，不报错
-        return text
-
-    client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com")
+    key = _cache_key("translate", text)
+    cached = cache_get(key)
+    if cached is not None:
+        return cached
 
     try:
-        resp = client.chat.completions.create(
+        resp = await client.chat.completions.create(
             model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": "你是一个精准翻译助手，只输出翻译结果。"},
-                {"role": "user", "content": f"请把下面英文翻成自然简洁的中文：\n{text}"},
-            ],
+            messages=_translation_messages(text),
             temperature=0.1,
         )
-        return resp.choices[0].message.content.strip()
+        result = resp.choices[0].message.content.strip()
     except Exception:
         # 出错就退回英文标题，避免整个脚本挂掉
         return text
 
+    if result and result != text:
+        cache_set(key, result)
+    return result
+
+
+async def _gather_translate(titles: list, max_workers: int = 30) -> list:
+    """
+    并发翻译一组标题（信号量限制同时在途的请求数），返回顺序与 titles 一致。
+    没有 DEEPSEEK_API_KEY 时原样返回。
+    """
+    api_key = os.environ.get("DEEPSEEK_API_KEY")
+    if not api_key:
+        return list(titles)
+
+    client = _get_async_client(api_key)
+    sem = asyncio.Semaphore(max_workers)
+
+    async def bound(text):
+        async with sem:
+            return await _translate_async(client, text)
+
+    return await asyncio.gather(*(bound(t) for t in titles))
+
 
 def get_recent_data(df: pd.DataFrame, days_window: int) -> pd.DataFrame:
     """
     取最近 days_window 天内的新闻。
     （现在 df 基本是当天的，但保留这个函数以防以后改动）
+    时间列已在 load_today_news 里解析好，这里直接用 _ts。
     """
-    df = df.copy()
-    for col in ["published", "fetched_at"]:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
-
-    ts = df["published"].fillna(df["fetched_at"])
     cutoff = datetime.now(timezone.utc) - timedelta(days=days_window)
-    return df[ts >= cutoff]
+    return df[df["_ts"] >= cutoff]
 
 
 def load_today_news() -> pd.DataFrame:
     """
-    ✅ 优先加载“今天”的 news_YYYY-MM-DD.csv；
-    如果没有，就退而求其次，使用 data/raw 里最新的一份 news_*.csv。
+    ✅ 优先加载“今天”的 news_YYYY-MM-DD.parquet / .csv；
+    如果没有，就退而求其次，使用 data/raw 里最新的一份 news_* 文件。
+    返回时 published / fetched_at 已解析为 UTC 时间，并带有 _ts 列。
     """
     os.makedirs(RAW_DIR, exist_ok=True)
 
     today_str = datetime.now().strftime("%Y-%m-%d")
-    today_path = os.path.join(RAW_DIR, f"news_{today_str}.csv")
-
-    if os.path.exists(today_path):
-        print(f"[信息] 读取今天的新闻文件: {today_path}")
-        return pd.read_csv(today_path)
-
-    # 兜底：找 raw 里最新的 news_*.csv
-    pattern = os.path.join(RAW_DIR, "news_*.csv")
-    files = glob.glob(pattern)
-    if not files:
+    for ext in NEWS_EXTS:
+        today_path = os.path.join(RAW_DIR, f"news_{today_str}{ext}")
+        if os.path.exists(today_path):
+            print(f"[信息] 读取今天的新闻文件: {today_path}")
+            return _read_news_file(today_path)
+
+    # 兜底：找 raw 里最新的 news_*.parquet / news_*.csv（scandir 每个文件只 stat 一次）
+    with os.scandir(RAW_DIR) as it:
+        latest = max(
+            (e for e in it if e.is_file() and e.name.startswith("news_") and e.name.endswith(NEWS_EXTS)),
+            key=lambda e: e.stat().st_mtime,
+            default=None,
+        )
+    if latest is None:
         raise FileNotFoundError(
-            f"未找到任何 news_*.csv 文件，请先运行抓取脚本生成数据（目录：{RAW_DIR}）"
+            f"未找到任何 news_*.csv / news_*.parquet 文件，请先运行抓取脚本生成数据（目录：{RAW_DIR}）"
         )
 
-    latest_file = max(files, key=os.path.getmtime)
-    print(f"[警告] 今天的文件不存在，改为使用最新的文件: {latest_file}")
-    return pd.read_csv(latest_file)
+    print(f"[警告] 今天的文件不存在，改为使用最新的文件: {latest.path}")
+    return _read_news_file(latest.path)
 
 
 # ======================
 #   已推送链接管理
 # ======================
 
-def load_seen_links() -> set:
+def _open_seen_db() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(SEEN_DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(SEEN_DB_PATH)
+    conn.execute("CREATE TABLE IF NOT EXISTS seen(link TEXT PRIMARY KEY) WITHOUT ROWID")
+    return conn
+
+
+def _load_seen_csv() -> list:
     """
-    读取历史已推送的链接集合（seen_items.csv）。
-    如果不存在，则返回空集合（表示第一天，所有都算新）。
+    读取旧版 seen_items.csv 里的链接，用于第一次迁移到 sqlite。
     """
-    if not os.path.exists(SEEN_PATH):
-        print("[信息] 未发现 seen_items.csv，视为第一天推送。")
-        return set()
-
     try:
-        df_seen = pd.read_csv(SEEN_PATH)
+        df_seen = _read_csv(SEEN_PATH)
         if "link" not in df_seen.columns:
-            return set()
-        links = set(df_seen["link"].dropna().astype(str))
-        print(f"[信息] 已加载历史已推送链接 {len(links)} 条。")
-        return links
+            return []
+        return df_seen["link"].dropna().astype(str).unique().tolist()
     except Exception as e:
-        print(f"[警告] 读取 {SEEN_PATH} 出错: {e}，视为无历史记录。")
-        return set()
+        print(f"[警告] 读取 {SEEN_PATH} 出错: {e}，忽略旧版记录。")
+        return []
 
 
-def save_seen_links(links: set):
-    """
-    把最新的已推送链接集合写回 seen_items.csv。
-    """
-    os.makedirs(os.path.dirname(SEEN_PATH), exist_ok=True)
-    df_seen = pd.DataFrame(sorted(links), columns=["link"])
-    df_seen.to_csv(SEEN_PATH, index=False)
-    print(f"[信息] 已更新已推送链接集合，共 {len(links)} 条 -> {SEEN_PATH}")
+def _export_seen_csv(links: list):
+    if pa_csv is not None:
+        pa_csv.write_csv(pa.table({"link": links}), SEEN_PATH)
+    else:
+        pd.DataFrame({"link": links}).to_csv(SEEN_PATH, index=False)
 
 
-def filter_unseen_items(df: pd.DataFrame, seen_links: set) -> pd.DataFrame:
+def load_seen_links() -> pd.Index:
+    """
+    读取历史已推送的链接集合（seen_items.sqlite），返回 pd.Index，
+    后面 filter_unseen_items 直接拿它做哈希查找。
+    库是空的但存在旧版 seen_items.csv 时，先把 CSV 导入 sqlite。
+    如果都没有，则返回空 Index（表示第一天，所有都算新）。
+    """
+    empty = pd.Index([], dtype=object)
+    try:
+        with closing(_open_seen_db()) as conn:
+            links = [row[0] for row in conn.execute("SELECT link FROM seen")]
+            if not links and os.path.exists(SEEN_PATH):
+                links = _load_seen_csv()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO seen(link) VALUES (?)", [(link,) for link in links]
+                    )
+                print(f"[信息] 已把 {SEEN_PATH} 中的 {len(links)} 条链接迁移到 {SEEN_DB_PATH}。")
+    except sqlite3.Error as e:
+        print(f"[警告] 读取 {SEEN_DB_PATH} 出错: {e}，视为无历史记录。")
+        return empty
+
+    if not links:
+        print("[信息] 未发现已推送记录，视为第一天推送。")
+        return empty
+
+    print(f"[信息] 已加载历史已推送链接 {len(links)} 条。")
+    return pd.Index(links)
+
+
+def save_seen_links(new_links: Iterable[str], export_csv: bool = False):
+    """
+    把本次新推送的链接写入 seen_items.sqlite（已存在的自动忽略），
+    只写增量，不再整表重写。
+    export_csv=True 时额外导出一份完整的 seen_items.csv（兼容旧流程）。
+    """
+    # 按主键顺序写入；重复的链接由 INSERT OR IGNORE 忽略
+    rows = [(link,) for link in sorted(str(link) for link in new_links if link)]
+    with closing(_open_seen_db()) as conn:
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO seen(link) VALUES (?)", rows)
+        total = conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        if export_csv:
+            links = [row[0] for row in conn.execute("SELECT link FROM seen ORDER BY link")]
+            _export_seen_csv(links)
+            print(f"[信息] 已导出已推送链接 -> {SEEN_PATH}")
+    print(f"[信息] 已更新已推送链接集合，共 {total} 条 -> {SEEN_DB_PATH}")
+
+
+def filter_unseen_items(df: pd.DataFrame, seen_links: pd.Index) -> pd.DataFrame:
     """
     从 df 中只保留“还没有推送过的新闻”（link 不在 seen_links 中）。
     """
@@ -142,13 +305,13 @@ def filter_unseen_items(df: pd.DataFrame, seen_links: set) -> pd.DataFrame:
         print("[警告] 数据中没有 link 字段，无法做历史去重，全部保留。")
         return df
 
-    if not seen_links:
+    if len(seen_links) == 0:
         print("[信息] 当前没有历史记录，保留所有新闻用于首次推送。")
         return df
 
-    links_today = df["link"].astype(str)
-    mask_new = ~links_today.isin(seen_links)
-    df_new = df[mask_new].copy()
+    # get_indexer 在 C 层做哈希查找，找不到的位置返回 -1
+    mask_new = seen_links.get_indexer(df["link"].astype(str).to_numpy()) == -1
+    df_new = df[mask_new]
 
     removed = len(df) - len(df_new)
     print(f"[信息] 今日共 {len(df)} 条新闻，其中 {removed} 条已推送过，保留 {len(df_new)} 条新新闻。")
@@ -160,45 +323,22 @@ def filter_unseen_items(df: pd.DataFrame, seen_links: set) -> pd.DataFrame:
 #   DeepSeek 个性化推荐
 # =======================
 
-def get_deepseek_client():
-    """
-    初始化 DeepSeek 客户端。
-    需要环境变量 DEEPSEEK_API_KEY。
-    """
-    api_key = os.environ.get("DEEPSEEK_API_KEY")
-    if not api_key:
-        print("[警告] 未检测到环境变量 DEEPSEEK_API_KEY，跳过个性化推荐部分。")
-        return None
-
-    client = OpenAI(
-        api_key=api_key,
-        base_url="https://api.deepseek.com",
-    )
-    return client
-
-
-def score_item_with_deepseek(client: OpenAI, user_profile: str, item: dict) -> float:
-    """
-    给单条新闻打兴趣分（0-100），使用 DeepSeek。
-    只返回一个数字；解析失败时返回 0。
-    """
-    title = item.get("title", "") or ""
-    summary = item.get("summary", "") or ""
-    feed_name = item.get("feed_name", "") or ""
-    link = item.get("link", "") or ""
-
-    content_snippet = summary if summary.strip() else title
+# 打分用的正则和 prompt 模板，模块加载时构建一次
+_DIGIT_RE = re.compile(r"\d+")
+_JSON_DECODER = json.JSONDecoder()
+# 批量打分时每条摘要最多保留的字符数（单条打分不截断），控制一次请求的 token 数
+BATCH_SUMMARY_MAX_CHARS = 500
 
-    prompt = f"""
+_SCORE_PROMPT_TMPL = """
 你是一个个性化新闻推荐助手，请严格按照下面要求打分：
 
 [用户画像]
-{user_profile}
+{profile}
 
 [新闻信息]
-- 学校 / 媒体: {feed_name}
+- 学校 / 媒体: {feed}
 - 标题: {title}
-- 摘要: {content_snippet}
+- 摘要: {summary}
 - 链接: {link}
 
 任务：请根据“用户画像”和这条新闻的大致内容，
@@ -208,10 +348,104 @@ def score_item_with_deepseek(client: OpenAI, user_profile: str, item: dict) -> f
 - 80 分以上：很感兴趣，强烈推荐推送
 
 **非常重要：你的回复只能包含一个阿拉伯数字（0 到 100 之间的整数），不要带任何解释和其他内容。**
-"""
+""".format
+
+_BATCH_SCORE_PROMPT_TMPL = """
+你是一个个性化新闻推荐助手，请严格按照下面要求打分：
+
+[用户画像]
+{profile}
+
+[新闻列表]
+{news}
+
+任务：请根据“用户画像”和每条新闻的大致内容，
+判断用户看到每条新闻时的兴趣程度，分别打出一个 0-100 的分数：
+- 0 分：完全不感兴趣
+- 50 分：一般般，可以看看
+- 80 分以上：很感兴趣，强烈推荐推送
+
+**非常重要：只输出 JSON，格式为 {{"scores": [{{"idx": 0, "score": 73}}, ...]}}，
+每条新闻一项，idx 对应上面的编号，score 为 0 到 100 之间的整数，不要带任何解释。**
+""".format
+
+
+def _get_async_client(api_key: str) -> AsyncOpenAI:
+    """
+    进程内共用的异步 DeepSeek 客户端，底层是开启 HTTP/2 的 httpx.AsyncClient，
+    并发请求可以复用同一条 TCP + TLS 连接。
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=30,
+        )
+        _ASYNC_CLIENT = AsyncOpenAI(
+            api_key=api_key,
+            base_url="https://api.deepseek.com",
+            http_client=http_client,
+        )
+    return _ASYNC_CLIENT
+
+
+def _run_async(coro):
+    """
+    在进程内唯一的事件循环里运行协程（代替每次 asyncio.run 新建循环），
+    这样异步客户端的连接池可以跨多次调用复用；进程退出时统一关闭。
+    """
+    global _ASYNC_RUNNER
+    if _ASYNC_RUNNER is None:
+        _ASYNC_RUNNER = asyncio.Runner()
+        atexit.register(_close_async)
+    return _ASYNC_RUNNER.run(coro)
+
+
+def _close_async():
+    if _ASYNC_CLIENT is not None:
+        _ASYNC_RUNNER.run(_ASYNC_CLIENT.close())
+    _ASYNC_RUNNER.close()
+
+
+def get_async_deepseek_client() -> Optional[AsyncOpenAI]:
+    """
+    获取异步 DeepSeek 客户端（用于并发打分，进程内单例）。
+    需要环境变量 DEEPSEEK_API_KEY。
+    """
+    api_key = os.environ.get("DEEPSEEK_API_KEY")
+    if not api_key:
+        print("[警告] 未检测到环境变量 DEEPSEEK_API_KEY，跳过个性化推荐部分。")
+        return None
+
+    return _get_async_client(api_key)
+
+
+def _as_text(value) -> str:
+    """把 DataFrame 里的单元格转成字符串（NaN / None 视为空串）。"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+async def _score_item_async(client: AsyncOpenAI, user_profile: str, item: dict) -> Optional[float]:
+    """
+    给单条新闻打兴趣分（0-100），使用 DeepSeek。
+    只返回一个数字；回复里没有数字或请求出错时返回 None（不写缓存，下次重试）。
+    """
+    title = _as_text(item.get("title"))
+    summary = _as_text(item.get("summary"))
+    feed_name = _as_text(item.get("feed_name"))
+    link = _as_text(item.get("link"))
+
+    content_snippet = summary if summary.strip() else title
+
+    prompt = _SCORE_PROMPT_TMPL(
+        profile=user_profile, feed=feed_name, title=title, summary=content_snippet, link=link
+    )
 
     try:
-        resp = client.chat.completions.create(
+        resp = await client.chat.completions.create(
             model="deepseek-chat",
             messages=[
                 {"role": "system", "content": "你是一个只返回数字评分的推荐系统，不要输出解释。"},
@@ -222,14 +456,188 @@ def score_item_with_deepseek(client: OpenAI, user_profile: str, item: dict) -> f
         )
         content = resp.choices[0].message.content.strip()
         # 有时会返回“85/100”之类，这里提取第一个数字
-        digits = re.findall(r"\d+", content)
+        digits = _DIGIT_RE.findall(content)
         if not digits:
-            return 0.0
+            return None
         score = float(digits[0])
         return max(0.0, min(100.0, score))
     except Exception as e:
         print(f"[DeepSeek 错误] 打分失败: {e}")
-        return 0.0
+        return None
+
+
+def _parse_batch_scores(content: str) -> dict:
+    """
+    解析批量打分的回复，返回 {idx: score}。
+    期望格式：{"scores": [{"idx": 0, "score": 73}, ...]}，也兼容直接返回数组；
+    json.loads 失败时，从第一个 "[" 开始解析出第一个完整的 [...] 再试一次。
+    分数不是有限数（NaN / inf）的条目直接丢弃，交给调用方单条补打。
+    """
+    try:
+        parsed = json.loads(content)
+    except ValueError:
+        start = content.find("[")
+        if start < 0:
+            return {}
+        try:
+            parsed, _ = _JSON_DECODER.raw_decode(content, start)
+        except ValueError:
+            return {}
+
+    if isinstance(parsed, dict):
+        parsed = parsed.get("scores", [])
+    if not isinstance(parsed, list):
+        return {}
+
+    idxs, raw = [], []
+    for d in parsed:
+        try:
+            idx = int(d["idx"])
+            score = float(d["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        idxs.append(idx)
+        raw.append(score)
+
+    # 先去掉 NaN / inf（np.clip 会原样保留 NaN），再整批一次性截断到 [0, 100]
+    arr = np.asarray(raw, dtype=np.float64)
+    finite = np.isfinite(arr)
+    scores = np.clip(arr[finite], 0.0, 100.0)
+    return dict(zip(np.asarray(idxs, dtype=np.int64)[finite].tolist(), scores.tolist()))
+
+
+async def _score_batch_async(
+    client: AsyncOpenAI, user_profile: str, batch: list
+) -> List[Optional[float]]:
+    """
+    一次请求给一批新闻打分，返回与 batch 对齐的分数列表；
+    回复里缺失的条目为 None（由调用方单条补打）。
+    """
+    lines = []
+    for idx, item in enumerate(batch):
+        title = _as_text(item.get("title"))
+        summary = _as_text(item.get("summary"))
+        content_snippet = summary if summary.strip() else title
+        lines.append(
+            f"{idx}. 学校 / 媒体: {_as_text(item.get('feed_name'))}\n"
+            f"   标题: {title}\n"
+            f"   摘要: {content_snippet[:BATCH_SUMMARY_MAX_CHARS]}"
+        )
+    news_block = "\n".join(lines)
+
+    prompt = _BATCH_SCORE_PROMPT_TMPL(profile=user_profile, news=news_block)
+
+    try:
+        resp = await client.chat.completions.create(
+            model="deepseek-chat",
+            messages=[
+                {"role": "system", "content": "你是一个只返回 JSON 评分的推荐系统，不要输出解释。"},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.2,
+            response_format={"type": "json_object"},
+            stream=False,
+        )
+        parsed = _parse_batch_scores(resp.choices[0].message.content.strip())
+    except Exception as e:
+        print(f"[DeepSeek 错误] 批量打分失败: {e}")
+        parsed = {}
+
+    return [parsed.get(idx) for idx in range(len(batch))]
+
+
+async def score_items_batch(
+    client: AsyncOpenAI,
+    user_profile: str,
+    items: list,
+    batch_size: int = 15,
+    max_workers: int = 30,
+) -> list:
+    """
+    把 items 按 batch_size 分组，每组一次 DeepSeek 请求，组与组之间并发
+    （信号量限制同时在途的请求数）。返回的分数顺序与 items 一致。
+    已缓存的条目（同一链接 + 同一用户画像）直接复用，不再请求；
+    批量回复里漏掉的条目会退回单条打分，仍失败的记 0 分且不写缓存。
+    """
+    keys = [
+        _cache_key("score", _as_text(item.get("link")) or _as_text(item.get("title")), user_profile)
+        for item in items
+    ]
+    scores = []
+    for key in keys:
+        cached = cache_get(key)
+        scores.append(float(cached) if cached is not None else None)
+
+    todo = [i for i, score in enumerate(scores) if score is None]
+    if len(todo) < len(items):
+        print(f"[信息] 命中打分缓存 {len(items) - len(todo)} 条，需要请求 DeepSeek {len(todo)} 条。")
+    pending = [items[i] for i in todo]
+
+    sem = asyncio.Semaphore(max_workers)
+    batch_size = max(1, batch_size)
+    batches = [
+        pending[i * batch_size:(i + 1) * batch_size]
+        for i in range(math.ceil(len(pending) / batch_size))
+    ]
+
+    async def bound_batch(batch):
+        async with sem:
+            return await _score_batch_async(client, user_profile, batch)
+
+    async def bound_item(item_dict):
+        async with sem:
+            return await _score_item_async(client, user_profile, item_dict)
+
+    batch_results = await asyncio.gather(*(bound_batch(b) for b in batches))
+    new_scores = [score for batch_scores in batch_results for score in batch_scores]
+
+    missing = [j for j, score in enumerate(new_scores) if score is None]
+    if missing:
+        print(f"[警告] 批量打分有 {len(missing)} 条未返回分数，改为单条打分。")
+        retry = await asyncio.gather(*(bound_item(pending[j]) for j in missing))
+        for j, score in zip(missing, retry):
+            new_scores[j] = score
+
+    for i, score in zip(todo, new_scores):
+        if score is None:
+            scores[i] = 0.0
+        else:
+            scores[i] = score
+            cache_set(keys[i], str(score))
+
+    return scores
+
+
+def prefilter_candidates(candidates: pd.DataFrame, query: str, top_n: int, threshold: float) -> pd.DataFrame:
+    """
+    打分前的本地粗筛：用 TF-IDF 余弦相似度比较用户画像和每条新闻的标题 + 摘要，
+    保留相似度 > threshold 的新闻，另外补上相似度 > 0 里最高的 2 * top_n 条。
+    超过阈值的不足 top_n 条时（比如画像和新闻语言不同、几乎没有共同词），
+    不做筛选，全部交给 DeepSeek。
+    """
+    # scikit-learn 只有开启粗筛时才用到，放到这里再导入，避免每次运行都付出导入开销
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import linear_kernel
+
+    texts = (candidates["title"].fillna("").astype(str) + " " + candidates["summary"].fillna("").astype(str)).tolist()
+    vectorizer = TfidfVectorizer(max_features=4096)
+    try:
+        matrix = vectorizer.fit_transform(texts + [query])
+    except ValueError:
+        # 词表为空（全是空文本）时无法计算相似度
+        return candidates
+    sims = linear_kernel(matrix[-1], matrix[:-1])[0]
+
+    passed = sims > threshold
+    if passed.sum() < top_n:
+        print(f"[信息] 本地粗筛只有 {int(passed.sum())} 条超过阈值 {threshold}，不足 top_n，跳过粗筛。")
+        return candidates
+
+    top_k = pd.Series(sims).rank(method="first", ascending=False).to_numpy() <= 2 * top_n
+    # 相似度为 0 的新闻之间没有可比性，不靠排名位置（其实就是时间顺序）补进来
+    keep = passed | (top_k & (sims > 0))
+    print(f"[信息] 本地粗筛：{len(candidates)} 条候选中保留 {int(keep.sum())} 条交给 DeepSeek 打分。")
+    return candidates[keep]
 
 
 def personalized_recommendations(recent_df: pd.DataFrame, settings: dict) -> Optional[pd.DataFrame]:
@@ -248,45 +656,55 @@ def personalized_recommendations(recent_df: pd.DataFrame, settings: dict) -> Opt
         print("[提示] settings.yaml 中 personalization.user_profile 为空，跳过个性化推荐。")
         return None
 
-    client = get_deepseek_client()
+    client = get_async_deepseek_client()
     if client is None:
         return None
 
     max_candidates = int(personalization.get("max_candidates", 80))
     top_n = int(personalization.get("top_n", 10))
-    # 可以在 settings.yaml 里加 personalization.max_workers 配置，否则默认 30
+    # 可以在 settings.yaml 里加 personalization.max_workers 配置（同时在途的请求数），否则默认 30
     max_workers = int(personalization.get("max_workers", 30))
+    # personalization.batch_size：每次请求打包打分的新闻条数，默认 15
+    batch_size = int(personalization.get("batch_size", 15))
+    # personalization.prefilter：打分前的 TF-IDF 本地粗筛，默认关闭
+    # （画像和新闻需要是同一种语言，否则几乎没有共同词，粗筛会误删）
+    prefilter = personalization.get("prefilter", False)
+    prefilter_threshold = float(personalization.get("prefilter_threshold", 0.05))
 
     if recent_df.empty:
         print("[提示] recent_df 为空，没有可以做个性化推荐的新闻。")
         return None
 
-    # 按时间排序，最新在前
-    tmp = recent_df.copy()
-    for col in ["published", "fetched_at"]:
-        if col in tmp.columns:
-            tmp[col] = pd.to_datetime(tmp[col], errors="coerce", utc=True)
-    ts = tmp["published"].fillna(tmp["fetched_at"])
-    tmp = tmp.assign(_ts=ts).sort_values("_ts", ascending=False)
+    # 按时间排序，最新在前（_ts 在 load_today_news 里已经算好）
+    tmp = recent_df.sort_values("_ts", ascending=False)
+
+    # 多个源转载同一篇报道时，按规范化后的标题去重，只保留最新的一条
+    norm = tmp["title"].fillna("").astype(str).str.lower().str.replace(r"\s+", " ", regex=True).str.strip()
+    dup = norm.duplicated() & (norm != "")
+    if dup.any():
+        print(f"[信息] 按标题去重，去掉 {int(dup.sum())} 条重复新闻。")
+        tmp = tmp.loc[~dup]
 
     # 取前 max_candidates 条作为候选
-    candidates = tmp.head(max_candidates).copy()
+    candidates = tmp.head(max_candidates)
 
-    print(f"[信息] 正在使用 DeepSeek 并发为最近 {len(candidates)} 条新闻打兴趣分（max_workers={max_workers}）...")
+    # 本地 TF-IDF 粗筛，明显不相关的新闻不再花钱请求 DeepSeek
+    if prefilter:
+        candidates = prefilter_candidates(candidates, user_profile, top_n, prefilter_threshold)
 
-    # 把每一行转成 dict，方便在线程池里传参
-    items = list(candidates.to_dict(orient="records"))
+    print(
+        f"[信息] 正在使用 DeepSeek 并发为最近 {len(candidates)} 条新闻打兴趣分"
+        f"（batch_size={batch_size}, max_workers={max_workers}）..."
+    )
 
-    def _score(item_dict):
-        # 单条的包装函数，方便在线程池里调用
-        return score_item_with_deepseek(client, user_profile, item_dict)
+    # 把每一行转成 dict，方便传给打分协程
+    items = list(candidates.to_dict(orient="records"))
 
-    # 使用线程池并发请求
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        scores = list(executor.map(_score, items))
+    # 单个事件循环 + 信号量并发请求，每次请求打包 batch_size 条新闻
+    scores = _run_async(score_items_batch(client, user_profile, items, batch_size, max_workers))
 
-    candidates = candidates.assign(_personal_score=scores)
-    ranked = candidates.sort_values("_personal_score", ascending=False).head(top_n)
+    candidates = candidates.assign(personal_score=scores)
+    ranked = candidates.sort_values("personal_score", ascending=False).head(top_n)
 
     return ranked
 
@@ -330,60 +748,57 @@ def main():
         print("结束。")
         return
 
-    # ===== 这里开始：既打印，也顺便拼一个邮件文本 =====
-    print("【个性化推荐】根据你的性格和兴趣挑出的新闻：\n")
+    # 先并发翻译所有标题，循环里只负责输出
+    titles = personalized["title"].fillna("").astype(str).tolist()
+    max_workers = int(settings.get("personalization", {}).get("max_workers", 30))
+    zh_titles = _run_async(_gather_translate(titles, max_workers))
 
-    email_lines = []
-    email_lines.append("美国大学校园资讯 - 个性化推荐日报")
-    email_lines.append(f"生成时间：{now.strftime('%Y-%m-%d %H:%M')}")
-    email_lines.append("")
-    email_lines.append("【个性化推荐】根据你的性格和兴趣挑出的新闻：")
-    email_lines.append("")
+    # ===== 这里开始：既打印，也边写边存邮件文本 =====
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    date_str = now.strftime("%Y-%m-%d")
+    txt_path = os.path.join(REPORT_DIR, f"recommendations_{date_str}.txt")
+    # 先写临时文件，全部写完再改名：中途出错不会留下一份半截的日报被 send_email.py 发出去
+    tmp_path = txt_path + ".tmp"
+
+    print("【个性化推荐】根据你的性格和兴趣挑出的新闻：\n")
 
     # 用来更新 seen_links：只把“真正推送出去的”记到历史里
     recommended_links = set()
 
-    for _, row in personalized.iterrows():
-        zh_title = translate_to_zh(row.get("title", ""))
-        en_title = row.get("title", "")
-        feed_name = row.get("feed_name", "")
-        link = str(row.get("link", ""))
-        score = row.get("_personal_score", 0)
-
-        line1 = f"- [{feed_name}] ({int(score)} 分) {zh_title}"
-        line2 = f"    EN: {en_title}"
-        line3 = f"    链接: {link}"
-
-        # 打印到终端
-        print(line1)
-        print(line2)
-        print(line3)
-        print()
-
-        # 同时存到邮件文本里
-        email_lines.append(line1)
-        email_lines.append(line2)
-        email_lines.append(line3)
-        email_lines.append("")
-
-        if link:
-            recommended_links.add(link)
-
+    with open(tmp_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+        f.write("美国大学校园资讯 - 个性化推荐日报\n")
+        f.write(f"生成时间：{now.strftime('%Y-%m-%d %H:%M')}\n")
+        f.write("\n")
+        f.write("【个性化推荐】根据你的性格和兴趣挑出的新闻：\n")
+        f.write("\n")
+
+        for row, zh_title in zip(personalized.itertuples(index=False), zh_titles):
+            en_title = _as_text(row.title)
+            feed_name = _as_text(row.feed_name)
+            link = _as_text(row.link)
+            score = row.personal_score
+
+            block = (
+                f"- [{feed_name}] ({int(score)} 分) {zh_title}\n"
+                f"    EN: {en_title}\n"
+                f"    链接: {link}\n"
+                "\n"
+            )
+
+            # 打印到终端，同时写进邮件文本
+            print(block, end="")
+            f.write(block)
+
+            if link:
+                recommended_links.add(link)
+
+    os.replace(tmp_path, txt_path)
     print("结束。")
 
     # 5. 把本次“真正推荐”的链接并入 seen_links
     if recommended_links:
-        seen_links.update(recommended_links)
-        save_seen_links(seen_links)
-
-    # ===== 把邮件文本写入文件 =====
-    os.makedirs(REPORT_DIR, exist_ok=True)
-    date_str = now.strftime("%Y-%m-%d")
-    txt_path = os.path.join(REPORT_DIR, f"recommendations_{date_str}.txt")
-
-    email_body = "\n".join(email_lines)
-    with open(txt_path, "w", encoding="utf-8") as f:
-        f.write(email_body)
+        export_csv = bool(settings.get("storage", {}).get("export_seen_csv", False))
+        save_seen_links(recommended_links, export_csv=export_csv)
 
     print(f"\n[信息] 已将推荐内容保存到：{txt_path}")
 
@@ -1,11 +1,22 @@
 import os
 import yaml
+import asyncio
+import httpx
 import feedparser
 import pandas as pd
 from datetime import datetime, timezone
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
 CONFIG_FEEDS = "config/feeds.yaml"
+SETTINGS_PATH = "config/settings.yaml"
 DATA_DIR = "data/raw"
+MAX_CONCURRENCY = 16
 
 
 def load_feeds():
@@ -14,9 +25,32 @@ def load_feeds():
     return cfg["feeds"]
 
 
-def fetch_feed(feed):
-    url = feed["url"]
-    parsed = feedparser.parse(url)
+def load_raw_format():
+    """
+    读取 settings.yaml 里的 storage.raw_format（csv / parquet），默认 csv。
+    """
+    if not os.path.exists(SETTINGS_PATH):
+        return "csv"
+    with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+        settings = yaml.safe_load(f) or {}
+    return str((settings.get("storage") or {}).get("raw_format", "csv")).lower()
+
+
+def save_news(df, out_base, raw_format):
+    if raw_format == "parquet":
+        out_path = f"{out_base}.parquet"
+        df.to_parquet(out_path, index=False)
+    else:
+        out_path = f"{out_base}.csv"
+        if pa_csv is not None:
+            pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), out_path)
+        else:
+            df.to_csv(out_path, index=False)
+    return out_path
+
+
+def parse_feed(feed, content):
+    parsed = feedparser.parse(content)
     rows = []
     for e in parsed.entries:
         rows.append({
@@ -32,18 +66,36 @@ def fetch_feed(feed):
     return rows
 
 
-def main():
+async def fetch_feed(client, sem, feed):
+    async with sem:
+        resp = await client.get(feed["url"])
+    resp.raise_for_status()
+    # feedparser 可以直接解析 bytes，编码由它按 XML 声明判断
+    return parse_feed(feed, resp.content)
+
+
+async def main_async():
     os.makedirs(DATA_DIR, exist_ok=True)
     feeds = load_feeds()
     all_rows = []
 
-    for feed in feeds:
-        try:
-            rows = fetch_feed(feed)
-            all_rows.extend(rows)
-            print(f"Fetched {len(rows)} items from {feed['name']}")
-        except Exception as e:
-            print(f"Error fetching {feed['name']}: {e}")
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with httpx.AsyncClient(
+        timeout=20,
+        follow_redirects=True,
+        headers={"User-Agent": feedparser.USER_AGENT},
+    ) as client:
+        results = await asyncio.gather(
+            *[fetch_feed(client, sem, feed) for feed in feeds],
+            return_exceptions=True,
+        )
+
+    for feed, result in zip(feeds, results):
+        if isinstance(result, Exception):
+            print(f"Error fetching {feed['name']}: {result}")
+            continue
+        all_rows.extend(result)
+        print(f"Fetched {len(result)} items from {feed['name']}")
 
     if not all_rows:
         print("No data fetched.")
@@ -51,10 +103,14 @@ def main():
 
     df = pd.DataFrame(all_rows)
     today = datetime.now().strftime("%Y-%m-%d")
-    out_path = os.path.join(DATA_DIR, f"news_{today}.csv")
-    df.to_csv(out_path, index=False)
+    out_base = os.path.join(DATA_DIR, f"news_{today}")
+    out_path = save_news(df, out_base, load_raw_format())
     print(f"Saved {len(df)} rows to {out_path}")
 
 
+def main():
+    asyncio.run(main_async())
+
+
 if __name__ == "__main__":
     main()